@@ -1,24 +1,41 @@
 from __future__ import annotations
 
+import json
 import logging
 import os
 import sys
 from abc import ABC
 from collections import defaultdict
 from contextlib import contextmanager
+from functools import cached_property, lru_cache, wraps
+from hashlib import blake2b
 from itertools import chain
 from pathlib import Path
-from threading import RLock
-from typing import TYPE_CHECKING, Any, Dict, Generator, Iterator, Literal, NoReturn, Optional, Sequence, cast
+from threading import Lock
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    Literal,
+    NoReturn,
+    Optional,
+    Sequence,
+    TypeVar,
+    cast,
+)
 
-from cachetools import cached
 from packaging.requirements import Requirement
 from pyproject_api import (
     BackendFailed,
     CmdStatus,
+    EditableResult,
     Frontend,
     MetadataForBuildEditableResult,
     MetadataForBuildWheelResult,
+    WheelResult,
 )
 
 from tox.execute.pep517_backend import LocalSubProcessPep517Executor
@@ -35,7 +52,7 @@ from tox.tox_env.python.package import (
 from tox.tox_env.python.virtual_env.api import VirtualEnv
 from tox.util.file_view import create_session_view
 
-from .util import dependencies_with_extras, dependencies_with_extras_from_markers
+from .util import dependencies_with_extras_from_markers, extract_extra_markers
 
 if TYPE_CHECKING:
     from tox.config.sets import EnvConfigSet
@@ -53,6 +70,51 @@ else:  # pragma: no cover (py311+)
     import tomli as tomllib
 
 ConfigSettings = Optional[Dict[str, Any]]
+BuiltWheel = TypeVar("BuiltWheel", WheelResult, EditableResult)
+
+# files configuring the build, these are hashed by content rather than by their stat info
+_BUILD_CONFIG_FILES = ("pyproject.toml", "setup.cfg", "setup.py", "MANIFEST.in")
+# folders at the package root the build backends write their intermediate artifacts into
+_BUILD_ARTIFACT_DIRS = {"build", "dist"}
+
+
+def _source_tree_key(root: Path, skip: set[Path], salt: str) -> str:
+    """Hash the build configuration and the size/modification time of every other source file under root."""
+    digest = blake2b(salt.encode())
+    for name in _BUILD_CONFIG_FILES:
+        path = root / name
+        if path.is_file():
+            digest.update(f"\0{name}\0".encode())
+            digest.update(path.read_bytes())
+    for dir_path, dir_names, file_names in os.walk(root):
+        at_root = Path(dir_path) == root  # a nested build or dist folder might be a source package, so only prune here
+        dir_names[:] = sorted(
+            i
+            for i in dir_names
+            if not i.startswith(".")
+            and not (at_root and i in _BUILD_ARTIFACT_DIRS)
+            and i != "__pycache__"
+            and not i.endswith(".egg-info")  # never importable, so always generated (might live within src)
+            and i != "node_modules"
+            and Path(dir_path, i) not in skip
+            and not Path(dir_path, i, "pyvenv.cfg").exists()  # a virtual environment created within the project
+        )
+        for name in sorted(file_names):
+            if not name.startswith("."):
+                path = Path(dir_path, name)
+                try:
+                    stat = path.stat()
+                except OSError:  # e.g. a dangling symlink, only track that it's there
+                    digest.update(f"\0{path.relative_to(root)}\0-".encode())
+                else:
+                    digest.update(f"\0{path.relative_to(root)}\0{stat.st_size}\0{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _parse_requirement(value: str) -> Requirement:
+    # the same requirement strings show up for every environment, and requirements are not mutated once parsed
+    return Requirement(value)
 
 
 class ToxBackendFailed(Fail, BackendFailed):
@@ -75,18 +137,34 @@ class BuildEditableNotSupportedError(RuntimeError):
     """raised when build editable is not supported."""
 
 
+_RESPONSE_MARKER = b"Backend: Wrote response "
+_RESPONSE_MARKER_LEN = len(_RESPONSE_MARKER)
+
+
 class ToxCmdStatus(CmdStatus):
     def __init__(self, execute_status: ExecuteStatus) -> None:
         self._execute_status = execute_status
+        self._scan_offset = 0  # output before this offset has already been checked for the response marker
+        self._line_end_offset: int | None = None  # once the marker is found, checked for the end of its line up to this
 
     @property
     def done(self) -> bool:
-        # 1. process died
+        # 1. the backend output reported back that our command is done (only scan the output not yet seen)
         status = self._execute_status
-        if status.exit_code is not None:  # pragma: no branch
-            return True  # pragma: no cover
-        # 2. the backend output reported back that our command is done
-        return b"\n" in status.out.rpartition(b"Backend: Wrote response ")[0]
+        out = status.out
+        end = len(out)
+        if self._line_end_offset is None:
+            at = out.find(_RESPONSE_MARKER, self._scan_offset, end)
+            if at == -1:
+                self._scan_offset = max(0, end - _RESPONSE_MARKER_LEN + 1)
+            else:
+                self._line_end_offset = at + _RESPONSE_MARKER_LEN
+        if self._line_end_offset is not None:
+            if out.find(b"\n", self._line_end_offset, end) != -1:
+                return True
+            self._line_end_offset = end
+        # 2. process died (polling the process is a system call, so only do it if the output did not tell)
+        return status.exit_code is not None
 
     def out_err(self) -> tuple[str, str]:
         status = self._execute_status
@@ -100,13 +178,13 @@ class Pep517VenvPackager(PythonPackageToxEnv, ABC):
 
     def __init__(self, create_args: ToxEnvCreateArgs) -> None:
         super().__init__(create_args)
-        self._frontend_: Pep517VirtualEnvFrontend | None = None
         self.builds: defaultdict[str, list[EnvConfigSet]] = defaultdict(list)
         self.call_require_hooks: set[str] = set()
         self._distribution_meta: PathDistribution | None = None
         self._package_dependencies: list[Requirement] | None = None
+        self._package_dependencies_with_markers: list[tuple[Requirement, set[str | None]]] | None = None
         self._package_name: str | None = None
-        self._pkg_lock = RLock()  # can build only one package at a time
+        self._pkg_lock = Lock()  # can build only one package at a time (never re-entered, so no need for an RLock)
         self._package_paths: set[Path] = set()
         self._root: Path | None = None
 
@@ -119,17 +197,15 @@ class Pep517VenvPackager(PythonPackageToxEnv, ABC):
     @root.setter
     def root(self, value: Path) -> None:
         self._root = value
-        self._frontend_ = None  # force recreating the frontend with new root
+        self.__dict__.pop("_frontend", None)  # force recreating the frontend with new root
 
     @staticmethod
     def id() -> str:
         return "virtualenv-pep-517"
 
-    @property
+    @cached_property
     def _frontend(self) -> Pep517VirtualEnvFrontend:
-        if self._frontend_ is None:
-            self._frontend_ = Pep517VirtualEnvFrontend(self.root, self)
-        return self._frontend_
+        return Pep517VirtualEnvFrontend(self.root, self)
 
     def register_config(self) -> None:
         super().register_config()
@@ -153,6 +229,12 @@ class Pep517VenvPackager(PythonPackageToxEnv, ABC):
             default=self._frontend.backend.split(".")[0] == "setuptools",
             desc="create a fresh subprocess for every backend request",
         )
+        self.conf.add_config(
+            keys=["reuse_built_wheel"],
+            of_type=bool,
+            default=False,
+            desc="reuse the wheel built by an earlier run if the package sources did not change since",
+        )
 
     def _add_config_settings(self, build_type: str) -> None:
         # config settings passed to PEP-517-compliant build backend https://peps.python.org/pep-0517/#config-settings
@@ -169,12 +251,12 @@ class Pep517VenvPackager(PythonPackageToxEnv, ABC):
                 desc=f"config settings passed to the {key} backend API endpoint",
             )
 
-    @property
+    @cached_property
     def pkg_dir(self) -> Path:
         return cast(Path, self.conf["pkg_dir"])
 
-    @property
-    def meta_folder(self) -> Path:
+    @cached_property
+    def meta_folder(self) -> Path:  # cached, so we create it only once - rather than on every access
         meta_folder: Path = self.conf["meta_dir"]
         meta_folder.mkdir(exist_ok=True)
         return meta_folder
@@ -195,19 +277,34 @@ class Pep517VenvPackager(PythonPackageToxEnv, ABC):
 
     def _setup_env(self) -> None:
         super()._setup_env()
+        of_types: list[str] = []
         if "sdist" in self.call_require_hooks or "external" in self.call_require_hooks:
-            self._setup_build_requires("sdist")
+            of_types.append("sdist")
         if "wheel" in self.call_require_hooks:
-            self._setup_build_requires("wheel")
+            of_types.append("wheel")
         if "editable" in self.call_require_hooks:
             if not self._frontend.optional_hooks["build_editable"]:
                 raise BuildEditableNotSupportedError
-            self._setup_build_requires("editable")
-
-    def _setup_build_requires(self, of_type: str) -> None:
-        settings: ConfigSettings = self.conf[f"config_settings_get_requires_for_build_{of_type}"]
-        requires = getattr(self._frontend, f"get_requires_for_build_{of_type}")(config_settings=settings).requires
-        self._install(requires, PythonPackageToxEnv.__name__, f"requires_for_build_{of_type}")
+            of_types.append("editable")
+        if of_types:
+            self._setup_build_requires(of_types)
+
+    def _setup_build_requires(self, of_types: list[str]) -> None:
+        # install the requirements of all build types with a single installer invocation; note the hooks are called
+        # one after the other (rather than concurrently) as they all talk to the same backend process, which reads
+        # and answers one request at a time on a single stdin/stdout pair
+        requires: dict[str, Requirement] = {}
+        for of_type in of_types:
+            settings: ConfigSettings = self.conf[f"config_settings_get_requires_for_build_{of_type}"]
+            hook = getattr(self._frontend, f"get_requires_for_build_{of_type}")
+            for req in hook(config_settings=settings).requires:
+                requires.setdefault(str(req), req)
+        # the cache key depends on the build types, so alternating between them does not trigger a recreation
+        self._install(list(requires.values()), PythonPackageToxEnv.__name__, f"requires_for_build_{'_'.join(of_types)}")
+
+    def _clean(self, transitive: bool = False) -> None:  # noqa: FBT001, FBT002
+        super()._clean(transitive)
+        self.__dict__.pop("meta_folder", None)  # lives within the env folder, so it might have been removed
 
     def _teardown(self) -> None:
         executor = self._frontend.backend_executor
@@ -238,7 +335,7 @@ class Pep517VenvPackager(PythonPackageToxEnv, ABC):
                 "package config for %s is editable, however the build backend %s does not support PEP-660, falling "
                 "back to editable-legacy - change your configuration to it",
                 names,
-                cast(Pep517VirtualEnvFrontend, self._frontend_).backend,
+                self._frontend.backend,
             )
             for env in targets:
                 env._defined["package"].value = "editable-legacy"  # type: ignore[attr-defined]  # noqa: SLF001
@@ -309,11 +406,11 @@ class Pep517VenvPackager(PythonPackageToxEnv, ABC):
                 return None  # if any dependencies are dynamic we can just calculate all dynamically
 
         deps_with_markers: list[tuple[Requirement, set[str | None]]] = [
-            (Requirement(i), {None}) for i in project.get("dependencies", [])
+            (_parse_requirement(i), {None}) for i in project.get("dependencies", [])
         ]
         optional_deps = project.get("optional-dependencies", {})
         for extra, reqs in optional_deps.items():
-            deps_with_markers.extend((Requirement(req), {extra}) for req in (reqs or []))
+            deps_with_markers.extend((_parse_requirement(req), {extra}) for req in (reqs or []))
         return dependencies_with_extras_from_markers(
             deps_with_markers=deps_with_markers,
             extras=extras,
@@ -324,48 +421,63 @@ class Pep517VenvPackager(PythonPackageToxEnv, ABC):
         # dependencies might depend on the python environment we're running in => if we build a wheel use that env
         # to calculate the package metadata, otherwise ourselves
         of_type: str = for_env["package"]
-        reqs: list[Requirement] | None = None
+        reqs: list[tuple[Requirement, set[str | None]]] | None = None
         name = ""
         if of_type in {"wheel", "editable"}:  # wheel packages
             w_env = self._wheel_build_envs.get(for_env["wheel_build_env"])
             if w_env is not None and w_env is not self:
                 with w_env.display_context(self._has_display_suspended):
                     if isinstance(w_env, Pep517VirtualEnvPackager):
-                        reqs, name = w_env.get_package_dependencies(for_env), w_env.get_package_name(for_env)
+                        reqs = w_env._get_package_dependencies_with_markers(for_env)  # noqa: SLF001
+                        name = w_env.get_package_name(for_env)
                     else:
                         reqs = []
         if reqs is None:
-            reqs = self.get_package_dependencies(for_env)
+            reqs = self._get_package_dependencies_with_markers(for_env)
             name = self.get_package_name(for_env)
         extras: set[str] = for_env["extras"]
-        return dependencies_with_extras(reqs, extras, name)
+        return dependencies_with_extras_from_markers(reqs, extras, name)
+
+    def _get_package_dependencies_with_markers(
+        self,
+        for_env: EnvConfigSet,
+    ) -> list[tuple[Requirement, set[str | None]]]:
+        # the extra markers do not depend on the extras requested, so extract them once for all run environments
+        reqs = self.get_package_dependencies(for_env)
+        with self._pkg_lock:
+            if self._package_dependencies_with_markers is None:  # pragma: no branch
+                self._package_dependencies_with_markers = extract_extra_markers(reqs)
+        return self._package_dependencies_with_markers
 
     def get_package_dependencies(self, for_env: EnvConfigSet) -> list[Requirement]:
         with self._pkg_lock:
             if self._package_dependencies is None:  # pragma: no branch
-                self._ensure_meta_present(for_env)
-                requires: list[str] = cast(PathDistribution, self._distribution_meta).requires or []
-                self._package_dependencies = [Requirement(i) for i in requires]  # pragma: no branch
+                requires: list[str] = self._ensure_meta_present(for_env).requires or []
+                self._package_dependencies = [_parse_requirement(i) for i in requires]  # pragma: no branch
         return self._package_dependencies
 
     def get_package_name(self, for_env: EnvConfigSet) -> str:
         with self._pkg_lock:
             if self._package_name is None:  # pragma: no branch
-                self._ensure_meta_present(for_env)
-                self._package_name = cast(PathDistribution, self._distribution_meta).metadata["Name"]
+                self._package_name = self._ensure_meta_present(for_env).metadata["Name"]
         return self._package_name
 
-    def _ensure_meta_present(self, for_env: EnvConfigSet) -> None:
+    def _ensure_meta_present(self, for_env: EnvConfigSet) -> PathDistribution:
         if self._distribution_meta is not None:  # pragma: no branch
-            return  # pragma: no cover
+            return self._distribution_meta  # pragma: no cover
         # even if we don't build a wheel we need the requirements for it should we want to build its metadata
         target: Literal["editable", "wheel"] = "editable" if for_env["package"] == "editable" else "wheel"
         self.call_require_hooks.add(target)
 
         self.setup()
-        hook = getattr(self._frontend, f"prepare_metadata_for_build_{target}")
-        config: ConfigSettings = self.conf[f"config_settings_prepare_metadata_for_build_{target}"]
-        result: MetadataForBuildWheelResult | MetadataForBuildEditableResult | None = hook(self.meta_folder, config)
+        result: MetadataForBuildWheelResult | MetadataForBuildEditableResult | None = None
+        config: ConfigSettings
+        if self._can_skip_prepare():  # will build a wheel either way, take the metadata from it
+            self._frontend._check_metadata_dir(self.meta_folder)  # noqa: SLF001 # as the prepare hook would
+        else:
+            hook = getattr(self._frontend, f"prepare_metadata_for_build_{target}")
+            config = self.conf[f"config_settings_prepare_metadata_for_build_{target}"]
+            result = hook(self.meta_folder, config)
         if result is None:
             config = self.conf[f"config_settings_build_{target}"]
             dist_info_path, _, __ = self._frontend.metadata_from_built(self.meta_folder, target, config)
@@ -373,6 +485,11 @@ class Pep517VenvPackager(PythonPackageToxEnv, ABC):
         else:
             dist_info = str(result.metadata)
         self._distribution_meta = Distribution.at(dist_info)
+        return self._distribution_meta
+
+    def _can_skip_prepare(self) -> bool:
+        # given we'll build a wheel either way we can extract the metadata from it and skip the prepare step
+        return "wheel" in self.builds or "editable" in self.builds
 
     def requires(self) -> tuple[Requirement, ...]:
         return self._frontend.requires
@@ -390,38 +507,75 @@ class Pep517VirtualEnvFrontend(Frontend):
     def __init__(self, root: Path, env: Pep517VenvPackager) -> None:
         super().__init__(*Frontend.create_args_from_folder(root))
         self._tox_env = env
+        # these only depend on the build-system of the project, so compute them once
+        self._backend_cmd: tuple[str, ...] = ("python", *self.backend_args)
+        self._backend_python_path = os.pathsep.join(str(i) for i in self._backend_paths).strip()
         self._backend_executor_: LocalSubProcessPep517Executor | None = None
-        into: dict[str, Any] = {}
+        self._hook_results: dict[str, Any] = {}
 
         for hook in chain(
             (f"get_requires_for_build_{build_type}" for build_type in ["editable", "wheel", "sdist"]),
             (f"prepare_metadata_for_build_{build_type}" for build_type in ["editable", "wheel"]),
             (f"build_{build_type}" for build_type in ["editable", "wheel", "sdist"]),
-        ):  # wrap build methods in a cache wrapper
-
-            def key(*args: Any, bound_return: str = hook, **kwargs: Any) -> str:  # noqa: ARG001
-                return bound_return
-
-            setattr(self, hook, cached(into, key=key)(getattr(self, hook)))
+        ):  # wrap build methods in a cache wrapper, each hook is called at most once per frontend
+            func = getattr(self, hook)
+            if hook == "build_editable":
+                func = self._reuse_wheel_hook(hook, func, EditableResult)
+            elif hook == "build_wheel":
+                func = self._reuse_wheel_hook(hook, func, WheelResult)
+            setattr(self, hook, self._cache_hook(hook, func))
+
+    def _cache_hook(self, hook: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        results = self._hook_results
+
+        @wraps(func)
+        def _cached(*args: Any, **kwargs: Any) -> Any:
+            if hook not in results:
+                results[hook] = func(*args, **kwargs)
+            return results[hook]
+
+        return _cached
+
+    def _reuse_wheel_hook(
+        self,
+        hook: str,
+        func: Callable[..., BuiltWheel],
+        result_type: Callable[[Path, str, str], BuiltWheel],
+    ) -> Callable[..., BuiltWheel]:
+        @wraps(func)
+        def _reuse(
+            wheel_directory: Path,
+            config_settings: ConfigSettings = None,
+            metadata_directory: Path | None = None,
+        ) -> BuiltWheel:
+            if not self._tox_env.conf["reuse_built_wheel"]:
+                return func(wheel_directory, config_settings, metadata_directory)
+            # the key is calculated before the build, as the backend might write into the source tree while building
+            skip = {self._tox_env.core["work_dir"], self._tox_env.pkg_dir}
+            key = _source_tree_key(self._root, skip, f"{hook} {json.dumps(config_settings, sort_keys=True)}")
+            key_file = wheel_directory / f".{hook}_cache_key"
+            if key_file.exists():
+                cached_key, _, name = key_file.read_text().partition("\n")
+                wheel = wheel_directory / name
+                if cached_key == key and name and wheel.exists():
+                    logging.info("reuse %s as the package sources did not change", name)
+                    return result_type(wheel, "", "")
+            result = func(wheel_directory, config_settings, metadata_directory)
+            key_file.write_text(f"{key}\n{result.wheel.name}")
+            return result
+
+        return _reuse
 
     @property
     def backend_cmd(self) -> Sequence[str]:
-        return ["python", *self.backend_args]
+        return self._backend_cmd
 
     def _send(self, cmd: str, **kwargs: Any) -> tuple[Any, str, str]:
         try:
-            if self._can_skip_prepare(cmd):
-                return None, "", ""  # will need to build wheel either way, avoid prepare
             return super()._send(cmd, **kwargs)
         except BackendFailed as exception:
             raise exception if isinstance(exception, ToxBackendFailed) else ToxBackendFailed(exception) from exception
 
-    def _can_skip_prepare(self, cmd: str) -> bool:
-        # given we'll build a wheel we might skip the prepare step
-        return cmd in {"prepare_metadata_for_build_wheel", "prepare_metadata_for_build_editable"} and (
-            "wheel" in self._tox_env.builds or "editable" in self._tox_env.builds
-        )
-
     @contextmanager
     def _send_msg(
         self,
@@ -464,9 +618,8 @@ class Pep517VirtualEnvFrontend(Frontend):
     def backend_executor(self) -> LocalSubProcessPep517Executor:
         if self._backend_executor_ is None:
             environment_variables = self._tox_env.environment_variables.copy()
-            backend = os.pathsep.join(str(i) for i in self._backend_paths).strip()
-            if backend:
-                environment_variables["PYTHONPATH"] = backend
+            if self._backend_python_path:
+                environment_variables["PYTHONPATH"] = self._backend_python_path
             self._backend_executor_ = LocalSubProcessPep517Executor(
                 colored=self._tox_env.options.is_colored,
                 cmd=self.backend_cmd,
@@ -49,6 +49,8 @@ def extract_extra_markers(deps: list[Requirement]) -> list[tuple[Requirement, se
 
 
 def _extract_extra_markers(req: Requirement) -> tuple[Requirement, set[str | None]]:
+    if req.marker is None:  # nothing to extract, so no need to copy it either
+        return req, {None}
     req = deepcopy(req)
     markers: list[str | tuple[Variable, Op, Variable]] = getattr(req.marker, "_markers", []) or []
     new_markers: list[str | tuple[Variable, Op, Variable]] = []
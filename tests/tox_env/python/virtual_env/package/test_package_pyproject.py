@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import json
+import sys
 from textwrap import dedent
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 
 import pytest
+from packaging.requirements import Requirement
+from pyproject_api import EditableResult, Frontend, RequiresBuildSdistResult, RequiresBuildWheelResult
 
 from tox.execute.local_sub_process import LocalSubprocessExecuteStatus
-from tox.tox_env.python.virtual_env.package.pyproject import Pep517VirtualEnvFrontend
+from tox.plugin.manager import MANAGER
+from tox.tox_env.python.virtual_env.package import pyproject
+from tox.tox_env.python.virtual_env.package.pyproject import Pep517VirtualEnvPackager, ToxCmdStatus
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -56,6 +61,35 @@ def test_get_package_deps_different_extras(pkg_with_extras_project: Path, tox_pr
     }
 
 
+def test_get_package_deps_extras_share_requirements(
+    pkg_with_extras_project: Path,
+    tox_project: ToxProjectCreator,
+    mocker: MockerFixture,
+) -> None:
+    ini = "[testenv:a]\npackage=sdist\nextras=docs\n[testenv:b]\npackage=sdist\nextras=format"
+    proj = tox_project({"tox.ini": ini})
+    execute_calls = proj.patch_execute(lambda r: 0 if "install" in r.run_id else None)
+    extract_extra_markers = mocker.spy(pyproject, "extract_extra_markers")
+
+    result = proj.run("r", "--root", str(pkg_with_extras_project), "-e", "a,b")
+
+    result.assert_success()
+    installs = {
+        i[0][0].conf.name: i[0][3].cmd[5:]
+        for i in execute_calls.call_args_list
+        if i[0][3].run_id.startswith("install_package_deps")
+    }
+    assert installs == {
+        "a": ["colorama>=0.4.3", "platformdirs>=2.1", "sphinx-rtd-theme<1,>=0.4.3", "sphinx>=3"],
+        "b": ["black>=3", "colorama>=0.4.3", "flake8", "platformdirs>=2.1"],
+    }
+    assert extract_extra_markers.call_count == 1  # the markers are extracted once, for all run environments
+    env = cast(Pep517VirtualEnvPackager, result.state.envs[".pkg"])
+    dependencies = env.get_package_dependencies(result.env_conf("a"))
+    requires = env._ensure_meta_present(result.env_conf("a")).requires or []  # noqa: SLF001
+    assert [str(i) for i in dependencies] == [str(Requirement(i)) for i in requires]  # shared ones left unchanged
+
+
 def test_package_root_via_root(tox_project: ToxProjectCreator, demo_pkg_inline: Path) -> None:
     ini = f"[tox]\npackage_root={demo_pkg_inline}\n[testenv]\npackage=wheel\nwheel_build_env=.pkg"
     proj = tox_project({"tox.ini": ini, "pyproject.toml": ""})
@@ -365,7 +399,7 @@ def test_pyproject_config_settings_wheel(
     proj.patch_execute(lambda r: 0 if "install" in r.run_id else None)
 
     write_stdin = mocker.spy(LocalSubprocessExecuteStatus, "write_stdin")
-    mocker.patch.object(Pep517VirtualEnvFrontend, "_can_skip_prepare", return_value=False)
+    mocker.patch.object(Pep517VirtualEnvPackager, "_can_skip_prepare", return_value=False)
 
     result = proj.run("r", "--notest", from_cwd=proj.path)
     result.assert_success()
@@ -404,7 +438,7 @@ def test_pyproject_config_settings_editable(
     proj.patch_execute(lambda r: 0 if "install" in r.run_id else None)
 
     write_stdin = mocker.spy(LocalSubprocessExecuteStatus, "write_stdin")
-    mocker.patch.object(Pep517VirtualEnvFrontend, "_can_skip_prepare", return_value=False)
+    mocker.patch.object(Pep517VirtualEnvPackager, "_can_skip_prepare", return_value=False)
 
     result = proj.run("r", "--notest", from_cwd=proj.path)
     result.assert_success()
@@ -443,7 +477,7 @@ def test_pyproject_config_settings_editable_legacy(
     proj.patch_execute(lambda r: 0 if "install" in r.run_id else None)
 
     write_stdin = mocker.spy(LocalSubprocessExecuteStatus, "write_stdin")
-    mocker.patch.object(Pep517VirtualEnvFrontend, "_can_skip_prepare", return_value=False)
+    mocker.patch.object(Pep517VirtualEnvPackager, "_can_skip_prepare", return_value=False)
 
     result = proj.run("r", "--notest", from_cwd=proj.path)
     result.assert_success()
@@ -458,3 +492,114 @@ def test_pyproject_config_settings_editable_legacy(
         "get_requires_for_build_wheel": {"C": "3"},
         "prepare_metadata_for_build_wheel": {"D": "4"},
     }
+
+
+def test_pyproject_meta_folder_recreated(tox_project: ToxProjectCreator, demo_pkg_inline: Path) -> None:
+    proj = tox_project({"tox.ini": "[testenv]\npackage = wheel"}, base=demo_pkg_inline)
+    proj.patch_execute(lambda r: 0 if "install" in r.run_id else None)
+    result = proj.run("r", "--notest")
+    result.assert_success()
+    meta_folder = cast(Pep517VirtualEnvPackager, result.state.envs[".pkg"]).conf["meta_dir"]
+    assert [i.name for i in meta_folder.glob("*.dist-info")] == ["demo_pkg_inline-1.0.0.dist-info"]
+
+    result = proj.run("r", "--notest", "-r")
+
+    result.assert_success()
+    assert [i.name for i in meta_folder.glob("*.dist-info")] == ["demo_pkg_inline-1.0.0.dist-info"]
+
+
+def test_tox_cmd_status_done_incremental(mocker: MockerFixture) -> None:
+    execute_status = mocker.MagicMock(exit_code=None, out=bytearray(b"Backend: run command build_wheel with args {}\n"))
+    status = ToxCmdStatus(execute_status)
+    assert not status.done
+
+    execute_status.out.extend(b"Backend: Wrote resp")
+    assert not status.done
+    execute_status.out.extend(b"onse /tmp/a.json")  # marker split across chunks, line not yet finished
+    assert not status.done
+    execute_status.out.extend(b" to /tmp")  # the response line arrives in pieces
+    assert not status.done
+    execute_status.out.extend(b"/b.json\n")
+    assert status.done
+
+
+def test_tox_cmd_status_done_process_died(mocker: MockerFixture) -> None:
+    execute_status = mocker.MagicMock(exit_code=1, out=bytearray(b"Traceback (most recent call last):\n"))
+    assert ToxCmdStatus(execute_status).done
+
+
+def test_tox_cmd_status_done_output_checked_before_process(mocker: MockerFixture) -> None:
+    execute_status = mocker.MagicMock(out=bytearray(b"Backend: Wrote response /tmp/a.json to /tmp/b.json\n"))
+    exit_code = mocker.PropertyMock(return_value=0)
+    type(execute_status).exit_code = exit_code
+    assert ToxCmdStatus(execute_status).done
+    exit_code.assert_not_called()  # the output already tells it's done, so no need to poll the process
+
+
+def test_pyproject_build_requires_installed_once(
+    tox_project: ToxProjectCreator,
+    demo_pkg_setuptools: Path,
+    mocker: MockerFixture,
+) -> None:
+    ini = "[testenv:a]\npackage = sdist\n[testenv:b]\npackage = wheel"
+    proj = tox_project({"tox.ini": ini}, base=demo_pkg_setuptools)
+    execute_calls = proj.patch_execute(lambda r: 0 if "install" in r.run_id else None)
+    sdist = RequiresBuildSdistResult((Requirement("a"), Requirement("b")), "", "")
+    mocker.patch.object(Frontend, "get_requires_for_build_sdist", return_value=sdist)
+    wheel = RequiresBuildWheelResult((Requirement("b"), Requirement("c")), "", "")
+    mocker.patch.object(Frontend, "get_requires_for_build_wheel", return_value=wheel)
+    on_install = mocker.spy(MANAGER, "tox_on_install")
+
+    result = proj.run("r", "-e", "a,b", "--notest")
+
+    result.assert_success()
+    of_types = [i[0][3] for i in on_install.call_args_list if i[0][3].startswith("requires_for_build_")]
+    assert of_types == ["requires_for_build_sdist_wheel"]
+    installs = [i[0][3] for i in execute_calls.call_args_list if i[0][3].run_id.startswith("install_requires_")]
+    assert [i.run_id for i in installs] == ["install_requires_for_build_sdist_wheel"]
+    assert installs[0].cmd[-3:] == ["a", "b", "c"]
+
+
+def test_pyproject_reuse_built_wheel(
+    tox_project: ToxProjectCreator,
+    demo_pkg_inline: Path,
+    mocker: MockerFixture,
+) -> None:
+    ini = "[testenv]\npackage = wheel\n[testenv:.pkg]\nreuse_built_wheel = true"
+    proj = tox_project({"tox.ini": ini, "src": {"build": {"__init__.py": "a = 1"}}}, base=demo_pkg_inline)
+    proj.patch_execute(lambda r: 0 if "install" in r.run_id else None)
+    if sys.platform != "win32":  # creating symlinks might need elevated privileges on Windows
+        (proj.path / "src" / "dangling").symlink_to(proj.path / "missing")
+    build_wheel = mocker.spy(Frontend, "build_wheel")
+
+    proj.run("r", "--notest").assert_success()
+    proj.run("r", "--notest").assert_success()
+    assert build_wheel.call_count == 1  # the second run reuses the wheel of the first one
+
+    (proj.path / "pyproject.toml").write_text(f"{(proj.path / 'pyproject.toml').read_text()}\n")
+    proj.run("r", "--notest").assert_success()
+    assert build_wheel.call_count == 2  # the build configuration changed, so build again
+
+    (proj.path / "src" / "build" / "__init__.py").write_text("a = 22")  # a nested source package named as build
+    proj.run("r", "--notest").assert_success()
+    assert build_wheel.call_count == 3  # a source file changed, so build again
+
+
+def test_pyproject_reuse_built_editable(
+    tox_project: ToxProjectCreator,
+    demo_pkg_inline: Path,
+    mocker: MockerFixture,
+) -> None:
+    ini = "[testenv]\npackage = editable\n[testenv:.pkg]\nset_env = BACKEND_HAS_EDITABLE=1\nreuse_built_wheel = true"
+    proj = tox_project({"tox.ini": ini}, base=demo_pkg_inline)
+    proj.patch_execute(lambda r: 0 if "install" in r.run_id else None)
+    build_editable = mocker.spy(Frontend, "build_editable")
+
+    proj.run("r", "--notest").assert_success()
+    result = proj.run("r", "--notest")
+
+    result.assert_success()
+    assert build_editable.call_count == 1  # the second run reuses the editable wheel of the first one
+    env = cast(Pep517VirtualEnvPackager, result.state.envs[".pkg"])
+    reused = env._frontend.build_editable(env.pkg_dir)  # noqa: SLF001
+    assert isinstance(reused, EditableResult)